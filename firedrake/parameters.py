@@ -84,6 +84,10 @@ parameters["default_sub_matrix_type"] = "baij"
 
 parameters["type_check_safe_par_loops"] = False
 
+# Run the VertexBasedLimiter bounds and limiting loops through numba
+# (if available) in serial, avoiding par_loop overhead on small meshes
+parameters["numba_slope_limiter"] = False
+
 
 def disable_performance_optimisations():
     """Switches off performance optimisations in Firedrake.
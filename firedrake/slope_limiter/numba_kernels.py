@@ -0,0 +1,47 @@
+"""Numba versions of the :class:`.VertexBasedLimiter` loops.
+
+This module imports numba at the top level, so it is only imported
+(by the limiter, on first use) when the numba path has been enabled
+through ``parameters["numba_slope_limiter"]``."""
+import numba
+
+
+@numba.njit(parallel=True, fastmath=True)
+def limit(q, qbar, qmax, qmin, dg_nodes, p0_nodes, cg_nodes):
+    """Limit each cell of the P1DG data ``q`` in place, doing the
+    same arithmetic as the par_loop limiting kernel."""
+    for c in numba.prange(dg_nodes.shape[0]):
+        qavg = qbar[p0_nodes[c, 0]]
+        alpha = 1.0
+        for i in range(dg_nodes.shape[1]):
+            dq = q[dg_nodes[c, i]] - qavg
+            if dq > 0:
+                num = qmax[cg_nodes[c, i]] - qavg
+            else:
+                num = qavg - qmin[cg_nodes[c, i]]
+            alpha = min(alpha, (num + 1e-300)/(abs(dq) + 1e-300))
+        for i in range(dg_nodes.shape[1]):
+            q[dg_nodes[c, i]] = qavg + alpha * (q[dg_nodes[c, i]] - qavg)
+
+
+@numba.njit(fastmath=True)
+def bounds(qbar, qmax, qmin, p0_nodes, cg_nodes):
+    """Compute the vertex bounds of the P0 data ``qbar``, doing the
+    same as the reset and min/max par_loops.  Cells scatter into
+    shared vertices, so this loop runs serially."""
+    qmax[:] = -1.0e10
+    qmin[:] = 1.0e10
+    for c in range(cg_nodes.shape[0]):
+        qc = qbar[p0_nodes[c, 0]]
+        for i in range(cg_nodes.shape[1]):
+            qmax[cg_nodes[c, i]] = max(qmax[cg_nodes[c, i]], qc)
+            qmin[cg_nodes[c, i]] = min(qmin[cg_nodes[c, i]], qc)
+
+
+@numba.njit(fastmath=True)
+def bounds_and_limit(q, qbar, qmax, qmin, dg_nodes, p0_nodes, cg_nodes):
+    """Compute the vertex bounds and limit ``q`` in a single call.
+    This function has no loops of its own; :func:`limit` is compiled
+    with its own ``parallel=True`` and keeps its parallel cell loop."""
+    bounds(qbar, qmax, qmin, p0_nodes, cg_nodes)
+    limit(q, qbar, qmax, qmin, dg_nodes, p0_nodes, cg_nodes)
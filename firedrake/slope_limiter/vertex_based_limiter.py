@@ -1,12 +1,29 @@
+from ufl import as_vector, inner
+
 from firedrake import dx, assemble, LinearSolver
 from firedrake.function import Function
-from firedrake.functionspace import FunctionSpace
-from firedrake.parloops import par_loop, READ, RW, MIN, MAX
+from firedrake.functionspace import FunctionSpace, VectorFunctionSpace
+from firedrake.parloops import par_loop, direct, READ, WRITE, RW, MIN, MAX
+from firedrake.parameters import parameters
 from firedrake.ufl_expr import TrialFunction, TestFunction
+from firedrake.utils import cached_property
 from firedrake.slope_limiter.limiter import Limiter
 __all__ = ("VertexBasedLimiter",)
 
 
+def _fmin_tree(terms):
+    """Build a balanced expression taking the minimum of ``terms``.
+
+    :arg terms: a non-empty list of expression strings.
+    :returns: a string nesting ``fmin`` calls pairwise, so that the
+        dependency chain has logarithmic rather than linear depth.
+    """
+    if len(terms) == 1:
+        return terms[0]
+    half = len(terms) // 2
+    return "fmin(%s, %s)" % (_fmin_tree(terms[:half]), _fmin_tree(terms[half:]))
+
+
 class VertexBasedLimiter(Limiter):
     """
     A vertex based limiter for P1DG fields.
@@ -34,38 +51,73 @@ class VertexBasedLimiter(Limiter):
         self.max_field = Function(self.P1CG)
         self.min_field = Function(self.P1CG)
 
-        self.centroid_solver = self._construct_centroid_solver()
+        # Right hand side form for the centroids, rebuilt only when
+        # the limited field changes
+        self._centroid_v = TestFunction(self.P0)
+        self._centroid_field = None
+        self._centroid_rhs_form = None
+
+        # The P0 mass matrix is diagonal, with the cell volumes on the
+        # diagonal, so _solve_centroids scales the right hand side with
+        # the inverse volumes rather than doing a linear solve.
+        self._inv_cell_volumes = 1.0 / assemble(self._centroid_v * dx).dat.data_ro
+
+        # Centroid right hand sides and their test functions for
+        # apply_batched, keyed by the number of fields, and the form
+        # for the most recently limited fields
+        self._batched_rhs = {}
+        self._batched_fields = None
+        self._batched_rhs_form = None
+
+        # Reset min and max bounds in a single pass over the vertices
+        domain = ""
+        instructions = """
+        maxq[0, 0] = -1.0e10
+        minq[0, 0] = 1.0e10
+        """
+        self._reset_bounds_loop = (domain, instructions)
 
         # Update min and max loop
         domain = "{[i]: 0 <= i < maxq.dofs}"
         instructions = """
+        <float64> qc = q[0]
         for i
-            maxq[i] = fmax(maxq[i], q[0])
-            minq[i] = fmin(minq[i], q[0])
+            maxq[i] = fmax(maxq[i], qc)
+            minq[i] = fmin(minq[i], qc)
         end
         """
         self._min_max_loop = (domain, instructions)
 
-        # Perform limiting loop
-        domain = "{[i, ii]: 0 <= i < q.dofs and 0 <= ii < q.dofs}"
+        # Perform limiting loop, unrolled over the dofs of the cell.
+        # The correction factor is computed without branching: num and
+        # abs(dq) are both non-negative, and the tiny shift makes a
+        # vertex with q == qavg leave alpha unchanged (ratio 1) without
+        # dividing by zero.
+        ndof = self.P1DG.finat_element.space_dimension()
+        ratios = "".join("""
+        <float64> dq{i} = q[{i}] - qavg
+        <float64> num{i} = (qmax[{i}] - qavg) if dq{i} > 0 else (qavg - qmin[{i}])
+        <float64> r{i} = (num{i} + 1e-300)/(abs(dq{i}) + 1e-300)""".format(i=i)
+                         for i in range(ndof))
+        updates = "".join("""
+        q[{i}] = qavg + alpha * dq{i}""".format(i=i) for i in range(ndof))
+        domain = ""
         instructions = """
-        <float64> alpha = 1
-        <float64> qavg = qbar[0, 0]
-        for i
-            <float64> _alpha1 = fmin(alpha, fmin(1, (qmax[i] - qavg)/(q[i] - qavg)))
-            <float64> _alpha2 = fmin(alpha, fmin(1, (qavg - qmin[i])/(qavg - q[i])))
-            alpha = _alpha1 if q[i] > qavg else (_alpha2 if q[i] < qavg else  alpha)
-        end
-        for ii
-            q[ii] = qavg + alpha * (q[ii] - qavg)
-        end
-        """
+        <float64> qavg = qbar[0, 0]{ratios}
+        <float64> alpha = fmin(1, {alpha}){updates}
+        """.format(ratios=ratios,
+                   alpha=_fmin_tree(["r%d" % i for i in range(ndof)]),
+                   updates=updates)
         self._limit_kernel = (domain, instructions)
 
     def _construct_centroid_solver(self):
         """
         Constructs a linear problem for computing the centroids
 
+        The base class does not use this solver, since its P0 mass
+        matrix is diagonal.  It is kept, via :attr:`centroid_solver`,
+        for subclasses whose :meth:`_solve_centroids` needs a solve.
+
         :return: LinearSolver instance
         """
         u = TrialFunction(self.P0)
@@ -75,20 +127,64 @@ class VertexBasedLimiter(Limiter):
                                                   'pc_type': 'bjacobi',
                                                   'sub_pc_type': 'ilu'})
 
+    @cached_property
+    def centroid_solver(self):
+        """
+        The centroid solver, constructed on first access
+        """
+        return self._construct_centroid_solver()
+
     def _update_centroids(self, field):
         """
         Update centroid values
         """
-        assemble(TestFunction(self.P0) * field * dx, tensor=self.centroids_rhs)
-        self.centroid_solver.solve(self.centroids, self.centroids_rhs)
+        if field is not self._centroid_field:
+            self._centroid_field = field
+            self._centroid_rhs_form = self._centroid_v * field * dx
+        assemble(self._centroid_rhs_form, tensor=self.centroids_rhs)
+        self._solve_centroids()
 
-    def compute_bounds(self, field):
+    def _solve_centroids(self):
         """
-        Only computes min and max bounds of neighbouring cells
+        Compute the centroids from their assembled right hand side
         """
-        self._update_centroids(field)
-        self.max_field.assign(-1.0e10)  # small number
-        self.min_field.assign(1.0e10)  # big number
+        self.centroids.dat.data[:] = self.centroids_rhs.dat.data_ro * self._inv_cell_volumes
+
+    def _assemble_batched_centroids_rhs(self, fields):
+        """
+        Assemble the centroid right hand sides of several fields at once
+
+        :return: array of shape (number of cells, number of fields)
+        """
+        n = len(fields)
+        if n not in self._batched_rhs:
+            VP0 = VectorFunctionSpace(self.P1DG.mesh(), 'DG', 0, dim=n)
+            self._batched_rhs[n] = (Function(VP0), TestFunction(VP0))
+        rhs, v = self._batched_rhs[n]
+        fields = tuple(fields)
+        if fields != self._batched_fields:
+            self._batched_fields = fields
+            self._batched_rhs_form = inner(as_vector(fields), v) * dx
+        assemble(self._batched_rhs_form, tensor=rhs)
+        return rhs.dat.data_ro
+
+    def _update_bounds(self):
+        """
+        Computes min and max bounds from the current centroids
+        """
+        kernels = self._numba_kernels()
+        if kernels is not None:
+            _, p0_nodes, cg_nodes = self._cell_nodes()
+            kernels.bounds(self.centroids.dat.data_ro,
+                           self.max_field.dat.data,
+                           self.min_field.dat.data,
+                           p0_nodes, cg_nodes)
+            return
+        par_loop(self._reset_bounds_loop,
+                 direct,
+                 {"maxq": (self.max_field, WRITE),
+                  "minq": (self.min_field, WRITE)},
+                 is_loopy_kernel=True)
 
         par_loop(self._min_max_loop,
                  dx,
@@ -97,10 +193,52 @@ class VertexBasedLimiter(Limiter):
                   "q": (self.centroids, READ)},
                  is_loopy_kernel=True)
 
+    def compute_bounds(self, field):
+        """
+        Only computes min and max bounds of neighbouring cells
+        """
+        self._update_centroids(field)
+        self._update_bounds()
+
+    def _numba_kernels(self):
+        """
+        The numba bounds and limiting kernels, or ``None`` if PyOP2
+        par_loops should be used instead.  The numba path is opt-in
+        through ``parameters["numba_slope_limiter"]``, requires numba,
+        and only works on serial, non-extruded meshes where the raw
+        data need no halo exchange.  numba is imported on first use so
+        that it does not slow down importing Firedrake.
+        """
+        if not (parameters["numba_slope_limiter"]
+                and self.P1DG.mesh().comm.size == 1
+                and not self.P1DG.extruded):
+            return None
+        try:
+            from firedrake.slope_limiter import numba_kernels
+        except ImportError:
+            return None
+        return numba_kernels
+
+    def _cell_nodes(self):
+        """
+        The P1DG, P0 and P1CG cell node maps used by the numba loops
+        """
+        return (self.P1DG.cell_node_map().values,
+                self.P0.cell_node_map().values,
+                self.P1CG.cell_node_map().values)
+
     def apply_limiter(self, field):
         """
         Only applies limiting loop on the given field
         """
+        kernels = self._numba_kernels()
+        if kernels is not None:
+            kernels.limit(field.dat.data,
+                          self.centroids.dat.data_ro,
+                          self.max_field.dat.data_ro,
+                          self.min_field.dat.data_ro,
+                          *self._cell_nodes())
+            return
         par_loop(self._limit_kernel, dx,
                  {"qbar": (self.centroids, READ),
                   "q": (field, RW),
@@ -115,5 +253,36 @@ class VertexBasedLimiter(Limiter):
         assert field.function_space() == self.P1DG, \
             'Given field does not belong to this objects function space'
 
+        kernels = self._numba_kernels()
+        if kernels is not None:
+            # Everything after the centroid assembly in one compiled call
+            self._update_centroids(field)
+            kernels.bounds_and_limit(field.dat.data,
+                                     self.centroids.dat.data_ro,
+                                     self.max_field.dat.data,
+                                     self.min_field.dat.data,
+                                     *self._cell_nodes())
+            return
         self.compute_bounds(field)
         self.apply_limiter(field)
+
+    def apply_batched(self, fields):
+        """
+        Re-computes centroids and applies limiter to several fields,
+        assembling the centroids of all of them in a single pass
+
+        :param fields: list of fields in this objects function space
+        """
+        for field in fields:
+            assert field.function_space() == self.P1DG, \
+                'Given field does not belong to this objects function space'
+
+        if not fields:
+            return
+
+        rhs = self._assemble_batched_centroids_rhs(fields)
+        for i, field in enumerate(fields):
+            self.centroids_rhs.dat.data[:] = rhs[:, i]
+            self._solve_centroids()
+            self._update_bounds()
+            self.apply_limiter(field)
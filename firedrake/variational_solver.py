@@ -1,3 +1,4 @@
+import numbers
 import ufl
 from itertools import chain
 from contextlib import ExitStack
@@ -22,6 +23,10 @@ def check_pde_args(F, J, Jp):
         raise TypeError("Provided residual is a '%s', not a Form or Slate Tensor" % type(F).__name__)
     if len(F.arguments()) != 1:
         raise ValueError("Provided residual is not a linear form")
+    check_operator_args(J, Jp)
+
+
+def check_operator_args(J, Jp):
     if not isinstance(J, (ufl.Form, slate.slate.TensorBase)):
         raise TypeError("Provided Jacobian is a '%s', not a Form or Slate Tensor" % type(J).__name__)
     if len(J.arguments()) != 2:
@@ -46,7 +51,7 @@ class NonlinearVariationalProblem(object):
     def __init__(self, F, u, bcs=None, J=None,
                  Jp=None,
                  form_compiler_parameters=None,
-                 is_linear=False):
+                 is_linear=False, _skip_checks=False):
         r"""
         :param F: the nonlinear form
         :param u: the :class:`.Function` to solve for
@@ -59,6 +64,8 @@ class NonlinearVariationalProblem(object):
             compiler (optional)
         :is_linear: internally used to check if all domain/bc forms
             are given either in 'A == b' style or in 'F == 0' style.
+        :_skip_checks: internally used by subclasses which have already
+            validated the forms they pass in.
         """
         from firedrake import solving
         from firedrake import function
@@ -79,15 +86,34 @@ class NonlinearVariationalProblem(object):
         self.J = J or ufl_expr.derivative(F, u)
 
         # Argument checking
-        check_pde_args(self.F, self.J, self.Jp)
+        if not _skip_checks:
+            check_pde_args(self.F, self.J, self.Jp)
 
         # Store form compiler parameters
         self.form_compiler_parameters = form_compiler_parameters
         self._constant_jacobian = False
 
+    @property
+    def bcs(self):
+        r"""The boundary conditions of this problem."""
+        return self._bcs
+
+    @bcs.setter
+    def bcs(self, bcs):
+        # Store a tuple, so the cached Dirichlet BCs below cannot go
+        # stale by in-place changes to a list passed in by the caller.
+        self._bcs = tuple(bcs)
+        try:
+            del self._dirichlet_bcs
+        except AttributeError:
+            pass
+
+    @utils.cached_property
+    def _dirichlet_bcs(self):
+        return tuple(chain.from_iterable(bc.dirichlet_bcs() for bc in self.bcs))
+
     def dirichlet_bcs(self):
-        for bc in self.bcs:
-            yield from bc.dirichlet_bcs()
+        yield from self._dirichlet_bcs
 
     @utils.cached_property
     def dm(self):
@@ -257,13 +283,17 @@ class NonlinearVariationalSolver(OptionsManager, NonlinearVariationalSolverMixin
         """
         # Make sure appcontext is attached to the DM before we solve.
         dm = self.snes.getDM()
-        for dbc in self._problem.dirichlet_bcs():
+        for dbc in self._problem._dirichlet_bcs:
             dbc.apply(self._problem.u)
 
         if bounds is not None:
             lower, upper = bounds
             with lower.dat.vec_ro as lb, upper.dat.vec_ro as ub:
                 self.snes.setVariableBounds(lb, ub)
+        # The SNES iterates on a separate work vector rather than on
+        # the Vec behind u: the residual callback copies each trial
+        # state into u, which would otherwise overwrite the current
+        # iterate while a line search is evaluating trial steps.
         work = self._work
         with self._problem.u.dat.vec as u:
             u.copy(work)
@@ -287,7 +317,8 @@ class LinearVariationalProblem(NonlinearVariationalProblem):
                  constant_jacobian=True):
         r"""
         :param a: the bilinear form
-        :param L: the linear form
+        :param L: the linear form, or ``0`` for a homogeneous right
+                 hand side
         :param u: the :class:`.Function` to which the solution will be assigned
         :param bcs: the boundary conditions (optional)
         :param aP: an optional operator to assemble to precondition
@@ -298,23 +329,32 @@ class LinearVariationalProblem(NonlinearVariationalProblem):
         :param constant_jacobian: (optional) flag indicating that the
                  Jacobian is constant (i.e. does not depend on
                  varying fields).  If your Jacobian can change, set
-                 this flag to ``False``.
+                 this flag to ``False``.  With the default of
+                 ``True`` the operator is assembled once and reused
+                 by every solve; call
+                 :meth:`LinearVariationalSolver.invalidate_jacobian`
+                 to force it to be reassembled.
         """
         # In the linear case, the Jacobian is the equation LHS.
         J = a
-        # Jacobian is checked in superclass, but let's check L here.
-        if L is 0:  # noqa: F632
+        # Check the operators and L here, including that L is a form
+        # on the test space of a, so that the residual built from them
+        # is a linear form and the superclass need not check it again.
+        check_operator_args(J, aP)
+        if isinstance(L, numbers.Number) and not isinstance(L, bool) and L == 0:
             F = ufl_expr.action(J, u)
         else:
             if not isinstance(L, (ufl.Form, slate.slate.TensorBase)):
                 raise TypeError("Provided RHS is a '%s', not a Form or Slate Tensor" % type(L).__name__)
             if len(L.arguments()) != 1:
                 raise ValueError("Provided RHS is not a linear form")
+            if L.arguments()[0].function_space() != J.arguments()[0].function_space():
+                raise ValueError("Provided RHS is not a linear form on the test space of the bilinear form")
             F = ufl_expr.action(J, u) - L
 
         super(LinearVariationalProblem, self).__init__(F, u, bcs, J, aP,
                                                        form_compiler_parameters=form_compiler_parameters,
-                                                       is_linear=True)
+                                                       is_linear=True, _skip_checks=True)
         self._constant_jacobian = constant_jacobian
 
 
@@ -57,6 +57,12 @@ def test_invalid_rhs_arity(a, L, f):
         solve(a == a, f)
 
 
+def test_rhs_test_space_mismatch(a, f):
+    W = FunctionSpace(f.function_space().mesh(), "DG", 0)
+    with pytest.raises(ValueError):
+        LinearVariationalProblem(a, TestFunction(W)*dx, f)
+
+
 def test_invalid_bc_type(a, L, f, c):
     with pytest.raises(TypeError):
         solve(a == L, f, bcs=(c, ))
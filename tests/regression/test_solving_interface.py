@@ -1,6 +1,7 @@
 import pytest
 from firedrake import *
 from firedrake.petsc import PETSc
+import numpy as np
 from numpy.linalg import norm as np_norm
 import gc
 
@@ -189,3 +190,42 @@ def test_constant_jacobian_lvs():
     lvs.solve()
 
     assert not (norm(assemble(out*5 - f)) < 2e-7)
+
+
+@pytest.mark.parametrize("zero", [0, 0.0, np.int64(0), np.float32(0)],
+                         ids=["int", "float", "int64", "float32"])
+def test_linear_problem_zero_rhs(a_L_out, zero):
+    a, _, out = a_L_out
+    out.assign(1)
+    problem = LinearVariationalProblem(a, zero, out)
+    LinearVariationalSolver(problem).solve()
+    assert np.allclose(out.dat.data_ro, 0)
+
+
+def test_linear_problem_bool_rhs_rejected(a_L_out):
+    a, _, out = a_L_out
+    with pytest.raises(TypeError):
+        LinearVariationalProblem(a, False, out)
+
+
+def test_reassign_problem_bcs():
+    mesh = UnitSquareMesh(4, 4)
+    V = FunctionSpace(mesh, "CG", 1)
+    u = TrialFunction(V)
+    v = TestFunction(V)
+    out = Function(V)
+
+    bcs = [DirichletBC(V, 1, "on_boundary")]
+    problem = LinearVariationalProblem(inner(grad(u), grad(v))*dx, 0, out, bcs=bcs)
+    assert tuple(problem.dirichlet_bcs()) == tuple(bcs)
+
+    # Changing the list passed in does not change the problem
+    bcs.append(DirichletBC(V, 3, "on_boundary"))
+    assert len(tuple(problem.dirichlet_bcs())) == 1
+
+    bc = DirichletBC(V, 2, "on_boundary")
+    problem.bcs = [bc]
+    assert tuple(problem.dirichlet_bcs()) == (bc, )
+
+    LinearVariationalSolver(problem).solve()
+    assert np.allclose(out.dat.data_ro, 2)
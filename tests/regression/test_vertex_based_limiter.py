@@ -51,6 +51,63 @@ def test_step_function_bounds(mesh):
     assert np.min(u.dat.data_ro) >= 0.0, "Failed by exceeding min values"
 
 
+def test_batched_matches_single(mesh):
+    x = SpatialCoordinate(mesh)
+    v = FunctionSpace(mesh, "DG", 1)
+    limiter = VertexBasedLimiter(v)
+
+    fields = [Function(v).interpolate(conditional(x[0] < 0.5, 1., 0.)),
+              Function(v).project(sin(2*pi*x[0]))]
+    expect = [Function(f) for f in fields]
+    for f in expect:
+        limiter.apply(f)
+
+    limiter.apply_batched([])
+    limiter.apply_batched(fields)
+    for f, e in zip(fields, expect):
+        assert np.allclose(f.dat.data_ro, e.dat.data_ro)
+
+
+@pytest.fixture
+def numba_parameter():
+    pytest.importorskip("numba")
+    old = parameters["numba_slope_limiter"]
+    yield
+    parameters["numba_slope_limiter"] = old
+
+
+def limit(field, method, use_numba):
+    parameters["numba_slope_limiter"] = use_numba
+    limiter = VertexBasedLimiter(field.function_space())
+    if method == "apply":
+        limiter.apply(field)
+    elif method == "apply_batched":
+        limiter.apply_batched([field])
+    elif method == "apply_limiter":
+        # Bounds from the par_loops, only the limiting loop differs
+        parameters["numba_slope_limiter"] = False
+        limiter.compute_bounds(field)
+        parameters["numba_slope_limiter"] = use_numba
+        limiter.apply_limiter(field)
+    return limiter
+
+
+@pytest.mark.parametrize("method", ["apply", "apply_batched", "apply_limiter"])
+def test_numba_matches_par_loop(mesh, method, numba_parameter):
+    x = SpatialCoordinate(mesh)
+    v = FunctionSpace(mesh, "DG", 1)
+    f = Function(v).project(sin(2*pi*x[0]))
+
+    expect = Function(f)
+    expect_limiter = limit(expect, method, use_numba=False)
+    assert not np.allclose(expect.dat.data_ro, f.dat.data_ro), "Nothing was limited"
+
+    limiter = limit(f, method, use_numba=True)
+    assert np.allclose(f.dat.data_ro, expect.dat.data_ro)
+    assert np.allclose(limiter.min_field.dat.data_ro, expect_limiter.min_field.dat.data_ro)
+    assert np.allclose(limiter.max_field.dat.data_ro, expect_limiter.max_field.dat.data_ro)
+
+
 def test_step_function_loop(mesh, iterations=100):
     # test function space
     v = FunctionSpace(mesh, "DG", 1)